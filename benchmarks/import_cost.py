@@ -0,0 +1,76 @@
+"""Startup time and memory of the modules behind each entry point of the app
+
+Every entry point is imported in a fresh interpreter, after frappe itself, so the
+numbers are what a web or background worker pays on top of frappe to serve it.
+
+Run from the bench directory with the bench python:
+
+    ./env/bin/python apps/esoft_bom_importer/benchmarks/import_cost.py
+"""
+import json
+import subprocess
+import sys
+
+ENTRY_POINTS = {
+    "api.validate_and_get_fg_products / get_bom_import_preview / import_bom_creator": "esoft_bom_importer.api",
+    "utils.create_bom_batch (FG job)": "esoft_bom_importer.utils",
+    "progress.get_import_progress": "esoft_bom_importer.progress",
+    "BOM Creator Tool History": (
+        "esoft_bom_importer.esoft_bom_importer.doctype."
+        "bom_creator_tool_history.bom_creator_tool_history"
+    ),
+    "tasks.compact_bom_import_history": "esoft_bom_importer.tasks",
+    "parser (.xlsx parsing)": "esoft_bom_importer.parser",
+}
+
+PROBE = """
+import json, resource, sys, time
+
+import frappe
+
+rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+__import__({module!r})
+{extra}
+elapsed = time.perf_counter() - start
+rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+print(json.dumps({{
+    "ms": round(elapsed * 1000, 1),
+    "rss_kb": rss_after - rss_before,
+    "pandas": "pandas" in sys.modules,
+    "erpnext": "erpnext" in sys.modules,
+}}))
+"""
+
+
+def measure(module, extra="", runs=5):
+    results = [
+        json.loads(
+            subprocess.check_output(
+                [sys.executable, "-c", PROBE.format(module=module, extra=extra)], text=True
+            )
+        )
+        for _ in range(runs)
+    ]
+    results.sort(key=lambda result: result["ms"])
+
+    # median run
+    return results[len(results) // 2]
+
+
+def main():
+    rows = [(name, measure(module)) for name, module in ENTRY_POINTS.items()]
+    # what a worker pays once it parses an .xlsx
+    rows.append(("parser + pandas (.xlsx import)", measure("esoft_bom_importer.parser", "import pandas")))
+
+    print(f"{'entry point':<80} {'ms':>8} {'RSS KB':>8}  pandas  erpnext")
+    for name, result in rows:
+        print(
+            f"{name:<80} {result['ms']:>8} {result['rss_kb']:>8}  "
+            f"{str(result['pandas']):<6}  {result['erpnext']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,22 @@
+from esoft_bom_importer.parser import convert_spreadsheet_to_json
 from esoft_bom_importer.utils import (
-    convert_spreadsheet_to_json,
     get_fg_products,
-    validate_and_enqueue_bom_creation
+    get_import_preview,
+    get_resumable_bom_tree,
+    start_bom_import
 )
 import frappe
-from esoft_bom_importer.validator import validate_migration_jobs
-from frappe.utils import now
+from esoft_bom_importer.export import (
+    IMPORT_SHEET_COLUMNS,
+    build_export_response,
+    iter_bom_creator_sheet_rows
+)
+from esoft_bom_importer.validator import (
+    get_job_name,
+    validate_file_not_in_import,
+    validate_migration_jobs
+)
+from frappe.utils import cint, now
 
 @frappe.whitelist()
 def validate_and_get_fg_products(file):
@@ -19,24 +30,91 @@ def validate_and_get_fg_products(file):
     return get_fg_products(bom_tree)
 
 
+@frappe.whitelist()
+def get_bom_import_preview(file, start=0, page_length=50):
+    """Return summary statistics and a page of the FGs that will be created from the file"""
+    if not file:
+        frappe.throw("Please upload a file first.")
+
+    start, page_length = cint(start), cint(page_length)
+    cache_key = f"esoft_import_preview::{file}"
+
+    # the first page parses the file, the following pages are served from cache
+    preview = frappe.cache().get_value(cache_key) if start else None
+    if not preview:
+        preview = get_import_preview(convert_spreadsheet_to_json(file))
+        frappe.cache().set_value(cache_key, preview, expires_in_sec=600)
+
+    fg_products = preview.get("fg_products")
+
+    return {
+        **{key: value for key, value in preview.items() if key != "fg_products"},
+        "fg_products": fg_products[start:start + page_length],
+        "has_more": start + page_length < len(fg_products),
+    }
+
+
 @frappe.whitelist()
 def import_bom_creator(filename):
     """Start background job for BOM processing"""
-    validate_migration_jobs()
+    validate_file_not_in_import(filename)
     bom_tree = convert_spreadsheet_to_json(filename)
     history = frappe.get_doc({
         "doctype": "BOM Creator Tool History",
-        "job_name": "bom_creator_job",
         "job_status": "Validating",
         "started_at": now(),
         "started_by": frappe.session.user,
         "file": filename,
         }).insert(ignore_permissions=True)
-    frappe.db.set_single_value("BOM Creator Tool", "status", "Validating")
-    frappe.enqueue(
-        method=validate_and_enqueue_bom_creation,
-        queue="long",
-        job_name="bom_creator_job",
-        bom_tree=bom_tree,
-        history=history.name
+    history.db_set("job_name", get_job_name(history.name))
+    frappe.db.set_single_value("BOM Creator Tool", "last_import", history.name)
+    # releases the tool row, so other imports can start while this one runs
+    frappe.db.commit()
+
+    return start_bom_import(bom_tree, history.name)
+
+
+@frappe.whitelist()
+def resume_bom_import(history):
+    """Re-enqueue the FGs of an import that were not created in its last run"""
+    validate_migration_jobs(history)
+    history_doc = frappe.get_doc("BOM Creator Tool History", history)
+    if history_doc.job_status == "Success":
+        frappe.throw(f"Import {history} has already completed successfully.")
+
+    bom_tree = get_resumable_bom_tree(history_doc, convert_spreadsheet_to_json(history_doc.file))
+    if not bom_tree:
+        frappe.throw(f"All finished goods of import {history} have already been processed.")
+
+    # every logged error belongs to an FG that is being resumed
+    history_doc.set("error_logs", [])
+    history_doc.update({
+        "job_status": "Validating",
+        "started_at": now(),
+        "completed_at": None,
+        "time_taken": None,
+        "seen": 0,
+        })
+    history_doc.save(ignore_permissions=True)
+    frappe.db.set_single_value("BOM Creator Tool", "last_import", history)
+    # releases the tool row, so other imports can start while this one runs
+    frappe.db.commit()
+    start_bom_import(bom_tree, history)
+
+    return [bom.get("item") for bom in bom_tree]
+
+
+@frappe.whitelist()
+def export_bom_creators(names=None, file_format="Excel"):
+    """Export the given or all BOM Creators in the column layout of the import sheet"""
+    frappe.has_permission("BOM Creator", "export", throw=True)
+    names = frappe.parse_json(names) if names else None
+    for name in names or []:
+        frappe.has_permission("BOM Creator", "read", name, throw=True)
+
+    return build_export_response(
+        "bom_creators",
+        IMPORT_SHEET_COLUMNS,
+        iter_bom_creator_sheet_rows(names),
+        file_format,
     )
@@ -18,7 +18,6 @@ frappe.ui.form.on("BOM Creator Tool", {
 
 function redirect_to_bom_history(frm) {
     frappe.route_options = {
-        job_name: "bom_creator_job",
         file: frm.doc.bom_creator,
         job_status: "Failed"
     };
@@ -30,20 +29,69 @@ function addCustomButtons(frm) {
     addProgressButton(frm)
 }
 
-function showConfirmationDialog(bomList, frm) {
-    const message = `
-        ${('The following finished goods BOMs will be created:')}
-        <br><ul>${bomList.map(bom => `<li>${bom}</li>`).join('')}</ul>
-        ${('Do you want to proceed?')}
-    `;
-
-    frappe.confirm(
-        message,
-        () => initiateBomCreation(frm),  // Proceed
-        () => frappe.msgprint(('BOM creation cancelled.')),  // Cancel
-        ('Confirm BOM Creation'),
-        [('Proceed'), ('Cancel')]
-    );
+function showConfirmationDialog(preview, frm) {
+    const dialog = new frappe.ui.Dialog({
+        title: ('Confirm BOM Creation'),
+        size: 'large',
+        fields: [
+            { fieldname: 'summary', fieldtype: 'HTML' },
+            { fieldname: 'fg_products', fieldtype: 'HTML' },
+        ],
+        primary_action_label: ('Proceed'),
+        primary_action: () => {
+            dialog.hide();
+            initiateBomCreation(frm);
+        },
+        secondary_action_label: ('Cancel'),
+        secondary_action: () => {
+            dialog.hide();
+            frappe.msgprint(('BOM creation cancelled.'));
+        },
+    });
+
+    dialog.fields_dict.summary.$wrapper.html(`
+        <table class="table table-bordered table-sm">
+            <tr><td>${('Finished Goods')}</td><td>${preview.fg_count}</td></tr>
+            <tr><td>${('Total Rows')}</td><td>${preview.total_nodes}</td></tr>
+            <tr><td>${('Max Depth')}</td><td>${preview.max_depth}</td></tr>
+            <tr><td>${('New Items')}</td><td>${preview.new_items}</td></tr>
+            <tr><td>${('Existing Items')}</td><td>${preview.existing_items}</td></tr>
+            <tr><td>${('Draft BOM Creators Replaced')}</td><td>${preview.drafts_replaced}</td></tr>
+            <tr><td>${('Submitted BOM Creators Skipped')}</td><td>${preview.submitted_skipped}</td></tr>
+        </table>
+    `);
+
+    const $wrapper = dialog.fields_dict.fg_products.$wrapper;
+    $wrapper.html(`
+        <div class="fg-product-list" style="max-height: 300px; overflow-y: auto;"><ul></ul></div>
+        <button class="btn btn-xs btn-default btn-load-more">${('Load More')}</button>
+    `);
+
+    const $list = $wrapper.find('ul');
+    const $loadMore = $wrapper.find('.btn-load-more');
+    let start = 0;
+
+    function renderPage(page) {
+        $list.append(page.fg_products.map(fg => `
+            <li>${frappe.utils.escape_html(fg.item)}
+                <span class="text-muted">(${fg.nodes} ${('rows')}${fg.sheet ? `, ${frappe.utils.escape_html(fg.sheet)}` : ''})</span>
+                ${fg.action !== 'Create' ? `<span class="indicator-pill ${fg.action === 'Skip' ? 'gray' : 'orange'}">${fg.action}</span>` : ''}
+            </li>
+        `).join(''));
+        start += page.fg_products.length;
+        $loadMore.toggle(page.has_more);
+    }
+
+    $loadMore.on('click', () => {
+        frappe.call({
+            method: 'esoft_bom_importer.api.get_bom_import_preview',
+            args: { file: frm.doc.bom_creator, start },
+            callback: (response) => renderPage(response.message),
+        });
+    });
+
+    renderPage(preview);
+    dialog.show();
 }
 
 function initiateBomCreation(frm) {
@@ -53,7 +101,9 @@ function initiateBomCreation(frm) {
         freeze: true,
         freeze_message: "Processing file, please wait...",
         callback: (response) => {
-            const msg = ('BOM creation started successfully. Please wait while its being created.');
+            const msg = response.message === 'Inline'
+                ? ('BOM creation completed. Please check the history for the result.')
+                : ('BOM creation started successfully. Please wait while its being created.');
             frappe.show_alert(msg);
             setTimeout(() => {
                 frm.reload_doc()
@@ -66,13 +116,14 @@ function initiateBomCreation(frm) {
 function addImportButton(frm) {
     frm.add_custom_button(('Import BOM Creator'), () => {
         frappe.call({
-            method: 'esoft_bom_importer.api.validate_and_get_fg_products',
+            method: 'esoft_bom_importer.api.get_bom_import_preview',
             args: { file: frm.doc.bom_creator },
+            freeze: true,
             callback: (response) => {
-                const bomList = response.message || [];
-                if (bomList.length === 0) return;
+                const preview = response.message;
+                if (!preview?.fg_count) return;
 
-                showConfirmationDialog(bomList, frm);
+                showConfirmationDialog(preview, frm);
             }
         });
     })
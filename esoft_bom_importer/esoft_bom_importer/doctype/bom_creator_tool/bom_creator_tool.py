@@ -1,6 +1,13 @@
 # Copyright (c) 2025, shaikhosama504 and contributors
 # For license information, please see license.txt
+import frappe
 from frappe.model.document import Document
 
 class BOMCreatorTool(Document):
-    pass
\ No newline at end of file
+    def onload(self):
+        # read from the last import, so import jobs never write the tool
+        self.status = (
+            frappe.db.get_value("BOM Creator Tool History", self.last_import, "job_status")
+            if self.last_import
+            else None
+        )
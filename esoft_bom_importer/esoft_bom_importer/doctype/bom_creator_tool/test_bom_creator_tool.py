@@ -1,9 +1,224 @@
 # Copyright (c) 2025, shaikhosama504 and Contributors
 # See license.txt
 
-# import frappe
+import os
+from tempfile import NamedTemporaryFile
+
+import frappe
 from frappe.tests.utils import FrappeTestCase
+from frappe.utils import cint
+
+from esoft_bom_importer.export import IMPORT_SHEET_COLUMNS, iter_bom_creator_sheet_rows
+from esoft_bom_importer.parser import (
+	clean_row,
+	get_bom_tree_json,
+	get_mandatory_col_errors,
+	has_import_header,
+	parse_sheet,
+	read_csv_rows,
+)
+from esoft_bom_importer.utils import get_row_ranges, replace_bom_creator_document, walk_bom_structure
+
+TEST_ITEM_GROUP = "_Test BOM Importer Group"
+TEST_HSN_CODE = "73089090"
+
+
+def make_node(index, item, children=None):
+	return {
+		"index": index,
+		"sheet": None,
+		"item": item,
+		"rev": "",
+		"description": item,
+		"operation": "",
+		"matl": "",
+		"item_group": TEST_ITEM_GROUP,
+		"qty_per_set": "1",
+		"length": 0,
+		"width": 0,
+		"thickness": 0,
+		"bl_weight": 0,
+		"area_sq_ft": 0,
+		"hsn_code": TEST_HSN_CODE,
+		"uom": "Nos",
+		"children": children or [],
+	}
+
+
+def make_test_fg():
+	return make_node(2, "_Test BOM Importer FG", [
+		make_node(3, "_Test BOM Importer A", [
+			make_node(4, "_Test BOM Importer A1"),
+			make_node(5, "_Test BOM Importer A2", [make_node(6, "_Test BOM Importer A21")]),
+		]),
+		make_node(7, "_Test BOM Importer B"),
+	])
+
+
+def get_bom_creator_rows(item_code):
+	rows = frappe.get_all(
+		"BOM Creator Item",
+		filters={"parent": frappe.db.get_value("BOM Creator", {"item_code": item_code}), "parenttype": "BOM Creator"},
+		fields=["name", "idx", "item_code", "fg_item", "fg_reference_id", "parent_row_no", "is_expandable"],
+		order_by="idx asc",
+	)
+	# row names differ between inserts, so references are compared by row position
+	idx_by_name = {row.name: row.idx for row in rows}
+
+	return [
+		(
+			row.idx,
+			row.item_code,
+			row.fg_item,
+			idx_by_name.get(row.fg_reference_id, row.fg_reference_id),
+			cint(row.parent_row_no),
+			row.is_expandable,
+		)
+		for row in rows
+	]
+
+
+def write_csv(content):
+	with NamedTemporaryFile("w", suffix=".csv", delete=False, encoding="utf-8") as f:
+		f.write(content)
+
+	return f.name
+
+
+def get_tree_shape(node):
+	return (
+		node["item"],
+		node["item_group"],
+		node["hsn_code"],
+		[get_tree_shape(child) for child in node["children"]],
+	)
+
+
+def create_test_masters():
+	if not frappe.db.exists("Item Group", TEST_ITEM_GROUP):
+		frappe.get_doc(
+			{"doctype": "Item Group", "item_group_name": TEST_ITEM_GROUP, "parent_item_group": "All Item Groups"}
+		).insert()
+
+	if not frappe.db.exists("GST HSN Code", TEST_HSN_CODE):
+		frappe.get_doc(
+			{"doctype": "GST HSN Code", "hsn_code": TEST_HSN_CODE, "description": TEST_HSN_CODE}
+		).insert()
 
 
 class TestBOMCreatorTool(FrappeTestCase):
-	pass
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		create_test_masters()
+
+	def test_get_row_ranges(self):
+		self.assertEqual(get_row_ranges([7, 2, 3, 4, 4]), "2-4, 7")
+		self.assertEqual(get_row_ranges([5]), "5")
+		self.assertEqual(get_row_ranges([]), "")
+
+	def test_walk_bom_structure_flattens_depth_first(self):
+		fg = make_node(2, "FG", [
+			make_node(3, "A", [make_node(4, "A1"), make_node(5, "A2", [make_node(6, "A21")])]),
+			make_node(7, "B"),
+		])
+
+		errors, rows = walk_bom_structure(fg)
+
+		self.assertEqual(errors, {})
+		self.assertEqual(
+			[(row["item"], row["parent_row_no"], row["is_expandable"]) for row in rows],
+			[("A", None, 1), ("A1", 1, 0), ("A2", 1, 1), ("A21", 3, 0), ("B", None, 0)],
+		)
+
+	def test_walk_bom_structure_has_no_depth_limit(self):
+		fg = node = make_node(1, "FG")
+		for index in range(5000):
+			child = make_node(index + 2, f"SA-{index}")
+			node["children"].append(child)
+			node = child
+
+		_, rows = walk_bom_structure(fg)
+
+		self.assertEqual(len(rows), 5000)
+		self.assertEqual(rows[-1]["parent_row_no"], 4999)
+
+	def test_bulk_insert_matches_regular_insert(self):
+		fg = make_test_fg()
+		rows = {}
+
+		# 0 disables bulk inserts, 1 bulk inserts every FG
+		for threshold in (0, 1):
+			frappe.db.set_single_value("BOM Creator Tool", "bulk_insert_threshold", threshold)
+			self.assertEqual(replace_bom_creator_document(fg), "Success")
+			rows[threshold] = get_bom_creator_rows(fg["item"])
+
+		self.assertEqual(len(rows[1]), 5)
+		self.assertEqual(rows[1], rows[0])
+
+	def test_exported_sheet_imports_as_the_same_tree(self):
+		fg = make_test_fg()
+		frappe.db.set_single_value("BOM Creator Tool", "bulk_insert_threshold", 0)
+		replace_bom_creator_document(fg)
+
+		name = frappe.db.get_value("BOM Creator", {"item_code": fg["item"]})
+		rows = [
+			# rows are read back as strings, like the csv module reads them
+			(row_no, clean_row(dict(zip(IMPORT_SHEET_COLUMNS, map(str, row)))))
+			for row_no, row in enumerate(iter_bom_creator_sheet_rows([name]), start=2)
+		]
+
+		self.assertEqual([get_tree_shape(node) for node in get_bom_tree_json(rows)], [get_tree_shape(fg)])
+
+	def test_read_csv_rows_blanks_missing_values(self):
+		file_path = write_csv(
+			"SR NO,Sub-Assembly,MATL,REV,UOM\n"
+			"1,FG, NA ,N/A,NULL\n"
+			"2,SA,nan,None\n"
+			"3,SB,CRCA,1,Nos,surplus\n"
+		)
+		self.addCleanup(os.remove, file_path)
+
+		rows = read_csv_rows(file_path)
+
+		self.assertEqual([row_no for row_no, _ in rows], [2, 3, 4])
+		# only exact NA strings are blank, like pandas read them
+		self.assertEqual(rows[0][1], {"SR NO": "1", "Sub-Assembly": "FG", "MATL": "NA", "REV": "", "UOM": ""})
+		self.assertEqual(rows[1][1], {"SR NO": "2", "Sub-Assembly": "SA", "MATL": "", "REV": "", "UOM": ""})
+		self.assertEqual(rows[2][1], {"SR NO": "3", "Sub-Assembly": "SB", "MATL": "CRCA", "REV": "1", "UOM": "Nos"})
+
+	def test_parse_sheet_builds_tree_from_csv(self):
+		file_path = write_csv(
+			"SR NO,Sub-Assembly,Parent,ITEM GROUP,QTY/ SET,HSN/SAC,UOM\n"
+			"1,FG,,Products,1,7308,Nos\n"
+			"2,SA,FG,Products,2,7308,Nos\n"
+			"3,SA1,SA,Products,1,7308,Nos\n"
+			"4,FG2,,Products,1,7308,Nos\n"
+		)
+		self.addCleanup(os.remove, file_path)
+
+		sheet_name, tree, errors = parse_sheet(file_path, None)
+
+		self.assertIsNone(sheet_name)
+		self.assertEqual(errors, [])
+		self.assertEqual(
+			[(node["item"], node["index"], [child["item"] for child in node["children"]]) for node in tree],
+			[("FG", 2, ["SA"]), ("FG2", 5, [])],
+		)
+		self.assertEqual(tree[0]["children"][0]["children"][0]["item"], "SA1")
+
+	def test_mandatory_col_errors(self):
+		rows = [
+			(2, {"SR NO": "1", "ITEM GROUP": "Products", "HSN/SAC": "7308", "QTY/ SET": "1", "UOM": "Nos"}),
+			(3, {"SR NO": "2", "ITEM GROUP": "", "HSN/SAC": "", "QTY/ SET": "1.5", "UOM": "Nos"}),
+		]
+
+		errors = get_mandatory_col_errors(rows)
+
+		self.assertEqual(len(errors), 3)
+		self.assertTrue(all("Row 3" in error and "Row 2" not in error for error in errors))
+
+	def test_has_import_header(self):
+		self.assertTrue(has_import_header([(2, {"SR NO": "1"})]))
+		self.assertTrue(has_import_header([(2, {"Sub-Assembly": "FG"})]))
+		self.assertFalse(has_import_header([(2, {"Instructions": "Fill in one row per item"})]))
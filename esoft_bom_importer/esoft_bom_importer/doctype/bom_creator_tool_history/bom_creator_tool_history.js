@@ -1,9 +1,15 @@
 // Copyright (c) 2025, shaikhosama504 and contributors
 // For license information, please see license.txt
 
+const HISTORY_METHOD = "esoft_bom_importer.esoft_bom_importer.doctype.bom_creator_tool_history.bom_creator_tool_history";
+const ERROR_LOG_PAGE_LENGTH = 20;
+
 frappe.ui.form.on("BOM Creator Tool History", {
     refresh(frm) {
         addCustomButton(frm)
+        addResumeButton(frm)
+        addExportButtons(frm)
+        renderErrorLogs(frm, 0)
     },
 });
 
@@ -13,4 +19,104 @@ function addCustomButton(frm) {
         frappe.set_route("Form", "BOM Creator Tool")
     })
 
-}
\ No newline at end of file
+}
+
+function addResumeButton(frm) {
+    if (!frm.doc.__onload?.can_resume) return;
+
+    frm.add_custom_button("Resume", () => {
+        frappe.call({
+            method: 'esoft_bom_importer.api.resume_bom_import',
+            args: { history: frm.doc.name },
+            freeze: true,
+            freeze_message: "Processing file, please wait...",
+            callback: (response) => {
+                const count = (response.message || []).length;
+                frappe.show_alert(`Resumed import for ${count} finished goods.`);
+                frm.reload_doc()
+            }
+        });
+    })
+}
+
+function addExportButtons(frm) {
+    if (!frm.doc.__onload?.error_log_count) return;
+
+    ["CSV", "Excel"].forEach(file_format => {
+        frm.add_custom_button(file_format, () => {
+            window.open(frappe.urllib.get_full_url(
+                `/api/method/${HISTORY_METHOD}.export_error_logs?`
+                + `history=${encodeURIComponent(frm.doc.name)}&file_format=${file_format}`
+            ));
+        }, "Export Errors");
+    });
+}
+
+function renderErrorLogs(frm, start) {
+    const $wrapper = frm.get_field("error_log_viewer").$wrapper;
+    frm.toggle_display("error_logs", !frm.doc.__onload?.lazy_error_logs);
+
+    if (!frm.doc.__onload?.error_log_count) {
+        $wrapper.empty();
+        return;
+    }
+
+    frappe.call({
+        method: `${HISTORY_METHOD}.get_error_logs`,
+        args: { history: frm.doc.name, start, page_length: ERROR_LOG_PAGE_LENGTH },
+        callback: (response) => {
+            const { total, error_logs } = response.message;
+            const escape = (value) => frappe.utils.escape_html(value == null ? "" : String(value));
+
+            $wrapper.html(`
+                <label class="control-label">Error Logs</label>
+                <table class="table table-bordered table-sm">
+                    <thead><tr>
+                        <th>No.</th><th>Error</th><th>Final Product</th><th>Sheet</th>
+                        <th>Rows</th><th>Occurrences</th><th>Failed While</th><th></th>
+                    </tr></thead>
+                    <tbody>${error_logs.map(log => `
+                        <tr>
+                            <td>${log.idx}</td>
+                            <td>${escape(log.error)}</td>
+                            <td title="${escape(log.affected_products)}">${escape(log.final_product)}</td>
+                            <td>${escape(log.sheet)}</td>
+                            <td>${escape(log.row_numbers || log.row_number)}</td>
+                            <td>${escape(log.occurrences)}</td>
+                            <td>${escape(log.failed_while)}</td>
+                            <td>${log.failed_while === "Running"
+                                ? `<a class="show-traceback" data-name="${escape(log.name)}">Traceback</a>`
+                                : ""}</td>
+                        </tr>`).join("")}
+                    </tbody>
+                </table>
+                <div class="flex justify-between align-center">
+                    <span class="text-muted">${start + 1} - ${start + error_logs.length} of ${total}</span>
+                    <span>
+                        <button class="btn btn-xs btn-default btn-prev" ${start ? "" : "disabled"}>Previous</button>
+                        <button class="btn btn-xs btn-default btn-next"
+                            ${start + ERROR_LOG_PAGE_LENGTH < total ? "" : "disabled"}>Next</button>
+                    </span>
+                </div>
+            `);
+
+            $wrapper.find(".btn-prev").on("click", () => renderErrorLogs(frm, start - ERROR_LOG_PAGE_LENGTH));
+            $wrapper.find(".btn-next").on("click", () => renderErrorLogs(frm, start + ERROR_LOG_PAGE_LENGTH));
+            $wrapper.find(".show-traceback").on("click", (e) => showTraceback(frm, $(e.currentTarget).data("name")));
+        }
+    });
+}
+
+function showTraceback(frm, error_log) {
+    frappe.call({
+        method: `${HISTORY_METHOD}.get_error_traceback`,
+        args: { history: frm.doc.name, error_log },
+        callback: (response) => {
+            frappe.msgprint({
+                title: "Traceback",
+                message: `<pre>${frappe.utils.escape_html(response.message || "")}</pre>`,
+                wide: true,
+            });
+        }
+    });
+}
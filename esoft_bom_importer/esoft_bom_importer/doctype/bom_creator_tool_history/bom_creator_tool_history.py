@@ -3,18 +3,160 @@
 
 import frappe
 from frappe.model.document import Document
+from frappe.utils import cint
+from esoft_bom_importer.export import build_export_response
 from esoft_bom_importer.validator import is_migration_jobs_queued
 
+ERROR_LOG_FIELDS = [
+    "idx",
+    "error",
+    "error_type",
+    "final_product",
+    "sheet",
+    "row_number",
+    "row_numbers",
+    "occurrences",
+    "affected_products",
+    "failed_while",
+]
+
+FORM_LOAD_METHOD = "frappe.desk.form.load.getdoc"
+
 
 class BOMCreatorToolHistory(Document):
     def onload(self):
+        self.strip_error_logs()
         self.update_seen_status()
+        self.set_onload("can_resume", self.can_resume())
+
+    def load_children_from_db(self):
+        # error logs can run into thousands of rows with tracebacks,
+        # the form pages them in through get_error_logs instead
+        if frappe.form_dict.get("cmd") != FORM_LOAD_METHOD:
+            return super().load_children_from_db()
+
+        for df in self.meta.get_table_fields():
+            if df.fieldname == "error_logs":
+                self.set("error_logs", [])
+                # keeps a save of this document from deleting the unloaded rows
+                self.set_onload("lazy_error_logs", 1)
+                continue
+
+            self.set(
+                df.fieldname,
+                frappe.db.get_values(
+                    df.options,
+                    {"parent": self.name, "parenttype": self.doctype, "parentfield": df.fieldname},
+                    "*",
+                    as_dict=True,
+                    order_by="idx asc",
+                )
+                or [],
+            )
+
+    def strip_error_logs(self):
+        self.set_onload(
+            "error_log_count",
+            frappe.db.count(
+                "BOM Creator History Log", {"parent": self.name, "parenttype": self.doctype}
+            ),
+        )
+        self.set_onload("lazy_error_logs", 1)
+        self.set("error_logs", [])
+
+    def update_child_table(self, fieldname, df=None):
+        # a form save carries no error logs, which must not delete them
+        if fieldname == "error_logs" and (self.get("__onload") or {}).get("lazy_error_logs"):
+            return
+
+        super().update_child_table(fieldname, df)
+
+    def can_resume(self):
+        if not self.fg_checkpoints:
+            return False
+
+        if self.job_status == "Failed":
+            return True
+
+        # an import whose jobs died with the worker never leaves In Progress
+        return (
+            self.job_status in ["Validating", "In Progress"]
+            and any(row.status == "Pending" for row in self.fg_checkpoints)
+            and not is_migration_jobs_queued(self.name)
+        )
 
     def update_seen_status(self):
         # skip updating db if job is running to avoid db bottleneck
-        if is_migration_jobs_queued() or self.job_status in ["Validating", "In Progress"]:
+        if self.seen or self.job_status in ["Validating", "In Progress"]:
+            return
+
+        if is_migration_jobs_queued(self.name):
+            return
+
+        self.db_set("seen", 1, update_modified=0)
+        frappe.db.commit()
+
+
+@frappe.whitelist()
+def get_error_logs(history, start=0, page_length=20):
+    frappe.has_permission("BOM Creator Tool History", "read", history, throw=True)
+
+    return {
+        "total": frappe.db.count(
+            "BOM Creator History Log",
+            {"parent": history, "parenttype": "BOM Creator Tool History"},
+        ),
+        "error_logs": frappe.get_all(
+            "BOM Creator History Log",
+            filters={"parent": history, "parenttype": "BOM Creator Tool History"},
+            fields=["name", *ERROR_LOG_FIELDS],
+            order_by="idx asc",
+            limit_start=cint(start),
+            limit_page_length=cint(page_length),
+        ),
+    }
+
+
+@frappe.whitelist()
+def get_error_traceback(history, error_log):
+    frappe.has_permission("BOM Creator Tool History", "read", history, throw=True)
+
+    return frappe.db.get_value(
+        "BOM Creator History Log", {"name": error_log, "parent": history}, "full_traceback"
+    )
+
+
+@frappe.whitelist()
+def export_error_logs(history, file_format="CSV"):
+    frappe.has_permission("BOM Creator Tool History", "read", history, throw=True)
+    fields = [*ERROR_LOG_FIELDS, "full_traceback"]
+
+    return build_export_response(
+        f"{history}-errors",
+        [frappe.unscrub(field) for field in fields],
+        iter_error_logs(history, fields),
+        file_format,
+    )
+
+
+def iter_error_logs(history, fields, chunk_size=500):
+    last_idx = 0
+
+    while True:
+        rows = frappe.get_all(
+            "BOM Creator History Log",
+            filters={
+                "parent": history,
+                "parenttype": "BOM Creator Tool History",
+                "idx": [">", last_idx],
+            },
+            fields=fields,
+            order_by="idx asc",
+            limit_page_length=chunk_size,
+            as_list=True,
+        )
+        if not rows:
             return
 
-        if not self.seen:
-            self.db_set("seen", 1, update_modified=0)
-            frappe.db.commit()
+        yield from rows
+        last_idx = rows[-1][0]
@@ -1,9 +1,121 @@
 # Copyright (c) 2025, shaikhosama504 and Contributors
 # See license.txt
 
-# import frappe
+from unittest.mock import patch
+
+import frappe
 from frappe.tests.utils import FrappeTestCase
+from frappe.utils import now
+
+from esoft_bom_importer.esoft_bom_importer.doctype.bom_creator_tool.test_bom_creator_tool import (
+	create_test_masters,
+	make_node,
+)
+from esoft_bom_importer.utils import (
+	create_bom_batch,
+	get_node_fields,
+	get_resumable_bom_tree,
+	walk_bom_structure,
+)
+
+
+def make_history(fgs, statuses=None):
+	statuses = statuses or {}
+
+	return frappe.get_doc(
+		{
+			"doctype": "BOM Creator Tool History",
+			"job_status": "In Progress",
+			"started_at": now(),
+			"fg_checkpoints": [
+				{"final_product": fg["item"], "row_number": fg["index"], "status": statuses.get(fg["item"], "Pending")}
+				for fg in fgs
+			],
+		}
+	).insert()
+
+
+def make_batch(history, fgs):
+	checkpoints = {row.final_product: row.name for row in history.fg_checkpoints}
+
+	return [
+		{
+			"bom_structure": get_node_fields(fg),
+			"rows": walk_bom_structure(fg)[1],
+			"current_index": index,
+			"should_proceed": True,
+			"checkpoint": checkpoints[fg["item"]],
+		}
+		for index, fg in enumerate(fgs)
+	]
+
+
+def get_checkpoint_statuses(history):
+	return dict(
+		frappe.get_all(
+			"BOM Creator History FG", filters={"parent": history}, fields=["final_product", "status"], as_list=True
+		)
+	)
 
 
 class TestBOMCreatorToolHistory(FrappeTestCase):
-	pass
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		create_test_masters()
+
+	def run_batch(self, history, fgs):
+		# the batch commits through set_progress, which would keep the test records
+		with patch.object(frappe.db, "commit"):
+			create_bom_batch(make_batch(history, fgs), len(fgs), history.name)
+
+	def test_failing_fg_rolls_back_only_itself(self):
+		good = make_node(2, "_Test BOM Importer Good FG", [make_node(3, "_Test BOM Importer Good SA")])
+		bad = make_node(4, "_Test BOM Importer Bad FG", [
+			make_node(5, "_Test BOM Importer Bad SA"),
+			{**make_node(6, "_Test BOM Importer Bad SB"), "item_group": "_Test BOM Importer Missing Group"},
+		])
+		history = make_history([good, bad])
+
+		self.run_batch(history, [good, bad])
+
+		self.assertTrue(frappe.db.exists("BOM Creator", {"item_code": good["item"]}))
+		self.assertTrue(frappe.db.exists("Item", "_Test BOM Importer Good SA"))
+		self.assertFalse(frappe.db.exists("BOM Creator", {"item_code": bad["item"]}))
+		# items created before the FG failed are rolled back with it
+		self.assertFalse(frappe.db.exists("Item", bad["item"]))
+		self.assertFalse(frappe.db.exists("Item", "_Test BOM Importer Bad SA"))
+		self.assertEqual(get_checkpoint_statuses(history.name), {good["item"]: "Success", bad["item"]: "Failed"})
+		self.assertEqual(
+			frappe.get_all("BOM Creator History Log", filters={"parent": history.name}, pluck="final_product"),
+			[bad["item"]],
+		)
+		self.assertEqual(frappe.db.get_value("BOM Creator Tool History", history.name, "job_status"), "Failed")
+
+	def test_get_resumable_bom_tree_skips_processed_fgs(self):
+		fgs = [make_node(2, "FG-1"), make_node(3, "FG-2"), make_node(4, "FG-3"), make_node(5, "FG-4")]
+		history = make_history(fgs, {"FG-1": "Success", "FG-2": "Skipped", "FG-3": "Failed"})
+
+		self.assertEqual([bom["item"] for bom in get_resumable_bom_tree(history, fgs)], ["FG-3", "FG-4"])
+		self.assertRaises(frappe.ValidationError, get_resumable_bom_tree, make_history([]), fgs)
+
+	def test_resumed_run_completes_once_no_fg_is_pending(self):
+		done = make_node(2, "_Test BOM Importer Done FG")
+		first = make_node(3, "_Test BOM Importer Resumed FG", [make_node(4, "_Test BOM Importer Resumed SA")])
+		second = make_node(5, "_Test BOM Importer Last FG")
+		# created by the earlier run, only the other FGs are resumed
+		history = make_history([done, first, second], {done["item"]: "Success"})
+
+		self.run_batch(history, [first])
+
+		self.assertEqual(frappe.db.get_value("BOM Creator Tool History", history.name, "job_status"), "In Progress")
+		self.assertIsNone(frappe.db.get_value("BOM Creator Tool History", history.name, "completed_at"))
+
+		self.run_batch(history, [second])
+
+		self.assertEqual(
+			get_checkpoint_statuses(history.name),
+			{done["item"]: "Success", first["item"]: "Success", second["item"]: "Success"},
+		)
+		self.assertEqual(frappe.db.get_value("BOM Creator Tool History", history.name, "job_status"), "Success")
+		self.assertTrue(frappe.db.get_value("BOM Creator Tool History", history.name, "completed_at"))
@@ -0,0 +1,215 @@
+import csv
+from collections import defaultdict
+from io import TextIOWrapper
+from tempfile import TemporaryFile
+
+import frappe
+from frappe.utils import flt
+from werkzeug.wrappers import Response
+from werkzeug.wsgi import wrap_file
+
+
+IMPORT_SHEET_COLUMNS = [
+    "SR NO",
+    "Sub-Assembly",
+    "REV",
+    "PART DESCRIPTION",
+    "Parent",
+    "MATL",
+    "ITEM GROUP",
+    "operation",
+    "Den",
+    "QTY/ SET",
+    "L",
+    "W",
+    "T",
+    "BL.WT.",
+    "AREA SQ.FT.",
+    "HSN/SAC",
+    "UOM",
+]
+
+
+def build_export_response(filename, columns, rows, file_format="CSV"):
+    """Write `rows` to a temporary file as they are produced and stream the file back
+
+    `rows` can be a generator, so the full result set is never held in memory.
+    """
+    file = TemporaryFile()
+
+    if file_format == "Excel":
+        write_xlsx(file, columns, rows)
+        extension = "xlsx"
+        mimetype = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    else:
+        write_csv(file, columns, rows)
+        extension = "csv"
+        mimetype = "text/csv"
+
+    file.seek(0)
+
+    return Response(
+        wrap_file(frappe.local.request.environ, file),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{extension}"'},
+        direct_passthrough=True,
+    )
+
+
+def write_csv(file, columns, rows):
+    text = TextIOWrapper(file, encoding="utf-8", newline="")
+    writer = csv.writer(text)
+    writer.writerow(columns)
+    writer.writerows(rows)
+    text.flush()
+    text.detach()
+
+
+def write_xlsx(file, columns, rows):
+    from openpyxl import Workbook
+
+    # write only workbooks stream rows to disk instead of keeping them in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(columns)
+
+    for row in rows:
+        sheet.append(row)
+
+    workbook.save(file)
+
+
+def iter_bom_creator_sheet_rows(names=None, chunk_size=500):
+    """Yield BOM Creators and their items as rows of the import sheet, a chunk of BOMs at a time"""
+    for chunk in iter_bom_creator_chunks(names, chunk_size):
+        items = defaultdict(list)
+        for row in get_bom_creator_items(chunk):
+            items[row.parent].append(row)
+
+        for bom in get_bom_creators(chunk):
+            yield get_sheet_row(
+                sr_no=1,
+                item_code=bom.item_code,
+                parent="",
+                material="",
+                operations="",
+                qty=bom.qty,
+                length=0,
+                width=0,
+                thickness=0,
+                bl_weight=0,
+                area_sq_ft=0,
+                uom=bom.uom,
+                item=bom,
+            )
+
+            for sr_no, row in enumerate(items[bom.name], start=2):
+                yield get_sheet_row(
+                    sr_no=sr_no,
+                    item_code=row.item_code,
+                    parent=row.fg_item,
+                    material=row.custom_material,
+                    operations=row.custom_msf,
+                    qty=row.qty,
+                    length=row.custom_length,
+                    width=row.custom_width,
+                    thickness=row.custom_thickness,
+                    bl_weight=row.custom_blwt,
+                    area_sq_ft=row.custom_area_sqft,
+                    uom=row.uom,
+                    item=row,
+                )
+
+
+def iter_bom_creator_chunks(names=None, chunk_size=500):
+    if names:
+        for start in range(0, len(names), chunk_size):
+            yield names[start:start + chunk_size]
+        return
+
+    # get_list, so only the BOM Creators the user can read are exported
+    last_name = ""
+    while True:
+        chunk = frappe.get_list(
+            "BOM Creator",
+            filters={"name": [">", last_name]},
+            order_by="name asc",
+            limit_page_length=chunk_size,
+            pluck="name",
+        )
+        if not chunk:
+            return
+
+        yield chunk
+        last_name = chunk[-1]
+
+
+def get_bom_creators(names):
+    return frappe.db.sql(
+        """
+        select
+            bom.name, bom.item_code, bom.qty, bom.uom,
+            item.item_group, item.custom_rev, item.description, item.gst_hsn_code
+        from `tabBOM Creator` bom
+        left join `tabItem` item on item.name = bom.item_code
+        where bom.name in %(names)s
+        order by bom.name
+        """,
+        {"names": names},
+        as_dict=True,
+    )
+
+
+def get_bom_creator_items(names):
+    return frappe.db.sql(
+        """
+        select
+            bci.parent, bci.item_code, bci.fg_item, bci.qty, bci.uom, bci.item_group,
+            bci.custom_material, bci.custom_msf, bci.custom_length, bci.custom_width,
+            bci.custom_thickness, bci.custom_blwt, bci.custom_area_sqft,
+            item.custom_rev, item.description, item.gst_hsn_code
+        from `tabBOM Creator Item` bci
+        left join `tabItem` item on item.name = bci.item_code
+        where bci.parent in %(names)s and bci.parenttype = 'BOM Creator'
+        order by bci.parent, bci.idx
+        """,
+        {"names": names},
+        as_dict=True,
+    )
+
+
+def get_sheet_row(
+    sr_no,
+    item_code,
+    parent,
+    material,
+    operations,
+    qty,
+    length,
+    width,
+    thickness,
+    bl_weight,
+    area_sq_ft,
+    uom,
+    item,
+):
+    return [
+        sr_no,
+        item_code,
+        item.custom_rev or "",
+        item.description or "",
+        parent or "",
+        material or "",
+        item.item_group or "",
+        # stored comma separated, imported "+" separated
+        "+".join(operation.strip() for operation in (operations or "").split(",") if operation.strip()),
+        "",
+        flt(qty),
+        flt(length),
+        flt(width),
+        flt(thickness),
+        flt(bl_weight),
+        flt(area_sq_ft),
+        item.gst_hsn_code or "",
+        uom or "",
+    ]
@@ -0,0 +1,283 @@
+"""Reading BOM Creator import files into BOM trees
+
+pandas and openpyxl are only imported for .xlsx files, so CSV imports and the
+workers importing this module for other entry points do not pay for them.
+"""
+import csv
+import os
+import frappe
+from pathlib import Path
+
+# a sheet is read as an import sheet if it has one of the item columns
+IMPORT_HEADER_COLUMNS = ("Sub-Assembly", "SR NO")
+
+# the strings pandas reads as missing values by default
+NA_VALUES = frozenset(
+    {
+        "",
+        "#N/A",
+        "#N/A N/A",
+        "#NA",
+        "-1.#IND",
+        "-1.#QNAN",
+        "-NaN",
+        "-nan",
+        "1.#IND",
+        "1.#QNAN",
+        "<NA>",
+        "N/A",
+        "NA",
+        "NULL",
+        "NaN",
+        "None",
+        "n/a",
+        "nan",
+        "null",
+    }
+)
+
+
+def get_file_full_path(file):
+    file_doc = frappe.get_doc("File", {"file_url": file})
+    return file_doc.get_full_path()
+
+
+def convert_spreadsheet_to_json(file: str) -> list:
+    file_path = get_file_full_path(file)
+    ext = Path(file_path).suffix.lower()
+
+    if ext == ".xlsx":
+        results = parse_sheets(file_path, get_sheet_names(file_path))
+    elif ext == ".csv":
+        results = [parse_sheet(file_path, None)]
+    else:
+        frappe.throw(f"Unsupported file format: {ext}")
+
+    bom_tree = []
+    err = []
+    skipped_sheets = []
+
+    for sheet_name, sheet_tree, sheet_err in results:
+        if sheet_tree is None:
+            skipped_sheets.append(sheet_name)
+            continue
+
+        if sheet_err:
+            if len(results) > 1:
+                sheet_err = [f"<b>Sheet: {sheet_name}</b><br>"] + sheet_err
+            err.append("<br /><br />".join(sheet_err))
+
+        bom_tree.extend(sheet_tree)
+
+    if err:
+        frappe.throw("<br /><hr />".join(err))
+
+    if skipped_sheets:
+        frappe.msgprint(
+            f"Skipped sheets without the import header (<b>Sub-Assembly</b> or <b>SR NO</b>): "
+            f"{', '.join(skipped_sheets)}",
+            indicator="orange",
+            alert=True,
+        )
+
+    return bom_tree
+
+
+def get_sheet_names(file_path):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True)
+    try:
+        return workbook.sheetnames
+    finally:
+        workbook.close()
+
+
+def parse_sheets(file_path, sheet_names):
+    """Parse and validate the sheets of a workbook in parallel, one process per sheet"""
+    from concurrent.futures import ProcessPoolExecutor
+    from itertools import repeat
+
+    if len(sheet_names) == 1:
+        return [parse_sheet(file_path, sheet_names[0])]
+
+    max_workers = min(len(sheet_names), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(parse_sheet, repeat(file_path), sheet_names))
+
+
+def parse_sheet(file_path, sheet_name):
+    """Return (sheet name, BOM tree, errors) of a sheet, or of the whole file for CSV
+
+    Runs in a worker process, so errors are returned instead of thrown. The tree is
+    None for sheets that are not import sheets, e.g. instructions or lookups.
+    """
+    if sheet_name is None:
+        rows = read_csv_rows(file_path)
+    else:
+        rows = read_sheet_rows(file_path, sheet_name)
+
+    if not rows:
+        return sheet_name, [], []
+
+    if sheet_name is not None and not has_import_header(rows):
+        return sheet_name, None, []
+
+    err = get_mandatory_col_errors(rows)
+    if err:
+        return sheet_name, [], err
+
+    return sheet_name, get_bom_tree_json(rows, sheet_name), []
+
+
+def has_import_header(rows):
+    columns = rows[0][1]
+    return any(column in columns for column in IMPORT_HEADER_COLUMNS)
+
+
+def read_csv_rows(file_path):
+    """Read a CSV file with the csv module, as (row number, row) with stripped values"""
+    with open(file_path, newline="", encoding="utf-8-sig") as f:
+        return [
+            (idx + 2, clean_row(row))
+            for idx, row in enumerate(csv.DictReader(f))
+        ]
+
+
+def read_sheet_rows(file_path, sheet_name):
+    # pandas is kept for .xlsx, its cell conversion is what the import sheets are written for
+    import pandas as pd
+
+    df = pd.read_excel(file_path, sheet_name=sheet_name, engine="openpyxl", dtype=str)
+
+    return [
+        (idx + 2, clean_row(row))
+        for idx, row in enumerate(df.fillna("").to_dict("records"))
+    ]
+
+
+def clean_row(row):
+    # DictReader puts surplus cells under None and fills missing ones with None
+    return {
+        column: clean_value(value)
+        for column, value in row.items()
+        if column is not None
+    }
+
+
+def clean_value(value):
+    # pandas read these as blank cells, which import sheets rely on
+    if not isinstance(value, str) or value in NA_VALUES:
+        return ""
+
+    return value.strip()
+
+
+def get_mandatory_col_errors(rows):
+
+    blank_hsn_rows = get_hsn_blank_rows(rows)
+    blank_item_group_rows = get_item_group_blank_rows(rows)
+    uom_errors = get_invalid_uom_rows(rows)
+    err = []
+
+    if uom_errors:
+        err.append(
+            "<b>UOM Validation Failed</b><br><br>"
+            "The following rows have invalid UOM usage:<br><ul>"
+            "<li><b>Powder Item Group</b> should use UOM = <code>KG</code>.</li>"
+            "<li>If UOM = <code>Nos</code>, then quantity must be a whole number (no decimals).</li>"
+            "</ul>"
+            f"<br>Affected Rows: {', '.join('Row ' + str(row) for row in uom_errors)}"
+        )
+
+    if blank_hsn_rows:
+        err.append(
+            f"<li>The following rows are missing the <b>HSN/SAC</b> value in the attached BOM Creator file:</li>\n{', '.join('Row '+str(row) for row in blank_hsn_rows)}"
+        )
+
+    if blank_item_group_rows:
+        err.append(
+            f"<li>The following rows are missing the <b>ITEM GROUP</b> value in the attached BOM Creator file:</li>\n{', '.join('Row '+str(row) for row in blank_item_group_rows)}"
+        )
+
+    return err
+
+
+def get_hsn_blank_rows(rows):
+    return [row_no for row_no, row in rows if not row.get("HSN/SAC")]
+
+def get_item_group_blank_rows(rows):
+    return [row_no for row_no, row in rows if not row.get("ITEM GROUP")]
+
+def get_invalid_uom_rows(rows):
+    bad_rows = []
+
+    for row_no, row in rows:
+        item_group = row.get("ITEM GROUP", "").lower()
+        uom = row.get("UOM", "").lower()
+        qty = row.get("QTY/ SET", 0)
+
+        if "powder" in item_group and uom != "kg":
+            bad_rows.append(row_no)
+            continue
+
+        try:
+            qty = float(qty)
+            if uom == "nos" and not qty.is_integer():
+                bad_rows.append(row_no)
+        except (ValueError, TypeError):
+            bad_rows.append(row_no)
+
+    return bad_rows
+
+
+def get_bom_tree_json(rows, sheet=None):
+    """Build a hierarchical BOM structure from the rows of a sheet."""
+    node_map = {}
+    root_nodes = []
+
+    for row_no, row in rows:
+        item_id = row.get("Sub-Assembly") or row.get("SR NO")
+        if not item_id:
+            continue
+
+        node = {
+            "index": row_no,
+            "sheet": sheet,
+            "item": item_id,
+            "rev": row.get("REV", ""),
+            "description": row.get("PART DESCRIPTION", ""),
+            "parent_item": row.get("Parent", ""),
+            "matl": row.get("MATL", ""),
+            "item_group": row.get("ITEM GROUP", ""),
+            "operation": row.get("operation", ""),
+            "den": row.get("Den", ""),
+            "qty_per_set": row.get("QTY/ SET") or "1",
+            "length": row.get("L") or 0,
+            "width": row.get("W") or 0,
+            "thickness": row.get("T") or 0,
+            "bl_weight": row.get("BL.WT.") or 0,
+            "area_sq_ft": row.get("AREA SQ.FT.") or 0,
+            "hsn_code": row.get("HSN/SAC", ""),
+            "uom": row.get("UOM") or "Nos",
+            "children": [],
+        }
+
+        node_map[item_id] = node
+        parent_id = node["parent_item"]
+
+        if parent_id and parent_id in node_map:
+            node_map[parent_id]["children"].append(node)
+        else:
+            root_nodes.append(node)
+
+    return root_nodes
+
+
+def add_node_to_parent(parent_item, node, node_map, root_nodes):
+    """Add node to its parent or root if parent not found"""
+    parent_node = node_map.get(parent_item)
+    if parent_node:
+        parent_node["children"].append(node)
+    else:
+        root_nodes.append(node)
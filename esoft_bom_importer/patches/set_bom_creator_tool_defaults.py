@@ -0,0 +1,22 @@
+import frappe
+
+
+def execute():
+    """Set the defaults of BOM Creator Tool settings which were added after the tool was saved
+
+    Defaults of a Single doctype are not written on migrate, so the settings read as 0.
+    """
+    saved_fields = set(
+        frappe.db.sql_list(
+            "select field from `tabSingles` where doctype='BOM Creator Tool'"
+        )
+    )
+
+    defaults = {
+        df.fieldname: df.default
+        for df in frappe.get_meta("BOM Creator Tool").fields
+        if df.default and df.fieldname not in saved_fields
+    }
+
+    if defaults:
+        frappe.db.set_single_value("BOM Creator Tool", defaults)
@@ -2,12 +2,16 @@ from esoft_bom_importer.validator import is_migration_jobs_queued
 import frappe
 
 
-def set_progress(current, total, job, expires_in_sec=60):
+def get_progress_key(history):
+    return f"esoft_import_status::{history}"
+
+
+def set_progress(current, total, job, history, expires_in_sec=60):
     progress = (current / total) * 100
     status = "Completed" if progress >= 100 else "In Progress"
     
     frappe.cache().set_value(
-        "esoft_import_status",
+        get_progress_key(history),
         {"progress":  f"{progress:.2f}%", "job": job, "status": status},
         expires_in_sec=expires_in_sec,
     )
@@ -17,9 +21,13 @@ def set_progress(current, total, job, expires_in_sec=60):
 
 
 @frappe.whitelist()
-def get_import_progress():
-    esoft_import_status = frappe.cache().get_value("esoft_import_status")
-    if not esoft_import_status and is_migration_jobs_queued():
+def get_import_progress(history=None):
+    history = history or frappe.db.get_single_value("BOM Creator Tool", "last_import")
+    if not history:
+        return {}
+
+    esoft_import_status = frappe.cache().get_value(get_progress_key(history))
+    if not esoft_import_status and is_migration_jobs_queued(history):
         esoft_import_status = {
             "progress": "Background Jobs Queued. Please be patient while it's processed.",  # noqa: 501
             "job": None,
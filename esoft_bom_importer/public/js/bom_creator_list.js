@@ -0,0 +1,22 @@
+frappe.listview_settings["BOM Creator"] = frappe.listview_settings["BOM Creator"] || {};
+
+(() => {
+	const settings = frappe.listview_settings["BOM Creator"];
+	const onload = settings.onload;
+
+	settings.onload = function (listview) {
+		if (onload) onload.call(this, listview);
+
+		const exportBomCreators = (names) => {
+			open_url_post("/api/method/esoft_bom_importer.api.export_bom_creators", {
+				names: names ? JSON.stringify(names) : "",
+				file_format: "Excel",
+			});
+		};
+
+		listview.page.add_menu_item(__("Export All to Import Sheet"), () => exportBomCreators());
+		listview.page.add_actions_menu_item(__("Export to Import Sheet"), () => {
+			exportBomCreators(listview.get_checked_items(true));
+		}, false);
+	};
+})();
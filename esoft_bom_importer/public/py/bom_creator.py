@@ -13,3 +13,29 @@ class BomCreator(BOMCreator):
 
         for row in self.items:
             row.is_expandable = 1 if children_map.get(row.idx) else 0
+
+    def db_insert(self, *args, **kwargs):
+        super().db_insert(*args, **kwargs)
+
+        if self.flags.bulk_insert_items:
+            self.bulk_insert_items()
+
+    def bulk_insert_items(self):
+        rows = [row.get_valid_dict(convert_dates_to_str=True, ignore_virtual=True) for row in self.items]
+        if not rows:
+            return
+
+        fields = list(rows[0])
+        frappe.db.bulk_insert(
+            "BOM Creator Item", fields, [tuple(row.get(field) for field in fields) for row in rows]
+        )
+        self.flags.items_inserted = True
+
+    def get_all_children(self, parenttype=None):
+        children = super().get_all_children(parenttype)
+
+        # skip the rows already written by bulk_insert_items
+        if self.flags.items_inserted:
+            children = [child for child in children if child.parentfield != "items"]
+
+        return children
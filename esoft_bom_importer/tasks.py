@@ -0,0 +1,125 @@
+import frappe
+from frappe.utils import add_days, now, now_datetime
+
+from esoft_bom_importer.utils import get_tool_settings
+
+COMPACTED_PREFIX = "[compacted] "
+
+RETENTION_DEFAULTS = {
+    "traceback_retention_days": 30,
+    "history_retention_days": 365,
+    "retention_batch_size": 1000,
+    "retention_max_batches": 50,
+}
+
+
+def compact_bom_import_history():
+    """Compact old error log tracebacks and purge expired import histories, in batches"""
+    settings = get_retention_settings()
+    batch_size = settings.retention_batch_size or RETENTION_DEFAULTS["retention_batch_size"]
+    max_batches = settings.retention_max_batches or RETENTION_DEFAULTS["retention_max_batches"]
+
+    tracebacks_compacted = 0
+    if settings.traceback_retention_days:
+        tracebacks_compacted = compact_tracebacks(
+            add_days(now_datetime(), -settings.traceback_retention_days),
+            batch_size,
+            max_batches,
+        )
+
+    histories_purged, log_rows_purged = 0, 0
+    if settings.history_retention_days:
+        histories_purged, log_rows_purged = purge_histories(
+            add_days(now_datetime(), -settings.history_retention_days),
+            batch_size,
+            max_batches,
+        )
+
+    frappe.db.set_single_value(
+        "BOM Creator Tool",
+        {
+            "last_retention_run": now(),
+            "tracebacks_compacted": tracebacks_compacted,
+            "histories_purged": histories_purged,
+            "log_rows_purged": log_rows_purged,
+        },
+    )
+    frappe.db.commit()
+
+    frappe.logger("esoft_bom_importer").info(
+        f"BOM import retention: {tracebacks_compacted} tracebacks compacted, "
+        f"{histories_purged} histories and {log_rows_purged} log rows purged"
+    )
+
+
+def get_retention_settings():
+    return get_tool_settings(RETENTION_DEFAULTS)
+
+
+def compact_tracebacks(cutoff, batch_size, max_batches):
+    """Replace the full tracebacks of logs older than `cutoff` with their last line"""
+    compacted = 0
+
+    for _ in range(max_batches):
+        logs = frappe.db.sql(
+            """
+            select name, full_traceback
+            from `tabBOM Creator History Log`
+            where creation < %(cutoff)s and full_traceback like 'Traceback%%'
+            limit %(batch_size)s
+            """,
+            {"cutoff": cutoff, "batch_size": batch_size},
+            as_dict=True,
+        )
+        if not logs:
+            break
+
+        for log in logs:
+            frappe.db.set_value(
+                "BOM Creator History Log",
+                log.name,
+                "full_traceback",
+                COMPACTED_PREFIX + get_traceback_summary(log.full_traceback),
+                update_modified=False,
+            )
+
+        frappe.db.commit()
+        compacted += len(logs)
+
+    return compacted
+
+
+def get_traceback_summary(traceback):
+    """Return the exception line of a traceback, e.g. 'frappe.exceptions.ValidationError: ...'"""
+    lines = [line.strip() for line in traceback.splitlines() if line.strip()]
+    return lines[-1] if lines else ""
+
+
+def purge_histories(cutoff, batch_size, max_batches):
+    """Delete finished histories older than `cutoff` with their logs and FG checkpoints"""
+    # the tool links to the last import, which is never purged
+    last_import = frappe.db.get_single_value("BOM Creator Tool", "last_import")
+    histories_purged, log_rows_purged = 0, 0
+
+    for _ in range(max_batches):
+        histories = frappe.get_all(
+            "BOM Creator Tool History",
+            filters={
+                "creation": ["<", cutoff],
+                "job_status": ["not in", ["Validating", "In Progress"]],
+                "name": ["!=", last_import or ""],
+            },
+            pluck="name",
+            limit_page_length=batch_size,
+        )
+        if not histories:
+            break
+
+        log_rows_purged += frappe.db.count("BOM Creator History Log", {"parent": ["in", histories]})
+        frappe.db.delete("BOM Creator History Log", {"parent": ["in", histories]})
+        frappe.db.delete("BOM Creator History FG", {"parent": ["in", histories]})
+        frappe.db.delete("BOM Creator Tool History", {"name": ["in", histories]})
+        frappe.db.commit()
+        histories_purged += len(histories)
+
+    return histories_purged, log_rows_purged
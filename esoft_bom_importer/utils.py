@@ -1,52 +1,282 @@
 from esoft_bom_importer.progress import set_progress
-import pandas as pd
+from esoft_bom_importer.validator import get_job_name
+from collections import defaultdict
+from contextlib import ExitStack
+import time
 import frappe
-from pathlib import Path
-from erpnext import get_default_company
-from frappe.utils import now
+from frappe.utils import cint, flt, now
+from frappe.utils.background_jobs import get_queues_timeout
 from datetime import datetime
-from frappe.desk.treeview import get_all_nodes
+from redis.exceptions import LockError
+
+EXECUTION_DEFAULTS = {
+    "inline_threshold": 10,
+    "single_job_threshold": 200,
+    "batch_size": 10,
+    "bulk_insert_threshold": 500,
+}
+
+# longest a batch waits for FGs locked by other imports, in seconds
+FG_LOCK_WAIT = 600
+
+# errors on which the database has rolled back the whole transaction
+TRANSACTION_ERRORS = (frappe.QueryDeadlockError, frappe.QueryTimeoutError)
+
 
 def create_bom_from_hierarchy(
     bom_structure, current_index, total_length, history, should_proceed=True
 ):
-    item_code = bom_structure.get("item")
-    index = bom_structure.get("index")
-    is_last_itr = current_index + 1 == total_length
+    create_bom_batch(
+        [
+            {
+                "bom_structure": bom_structure,
+                "current_index": current_index,
+                "should_proceed": should_proceed,
+                "checkpoint": frappe.db.get_value(
+                    "BOM Creator History FG",
+                    {"parent": history, "final_product": bom_structure.get("item")},
+                ),
+            }
+        ],
+        total_length,
+        history,
+    )
+
 
-    update_bom_creator_tool_status(history, "In Progress")
+def create_bom_batch(batch, total_length, history, execution_mode="Fan Out"):
+    """Create the FGs of a batch in a single transaction
 
-    if should_proceed:
-        existing_name = frappe.db.exists("BOM Creator", {"item_code": item_code})
-        if existing_name:
-            existing_doc = frappe.get_doc("BOM Creator", existing_name)
-            if existing_doc.docstatus == 0:
-                frappe.delete_doc("BOM Creator", existing_name)
-            else:
-                # Skip if already submitted
-                return None
+    Every FG runs in its own savepoint, so a failing FG rolls back only its own changes.
+    A deadlock or lock wait timeout rolls back the whole transaction, so every FG of
+    the batch is marked failed instead.
+    """
+    # FG locks are held until the batch is committed
+    with ExitStack() as fg_locks:
+        lock_errors = acquire_fg_locks(fg_locks, batch, execution_mode)
 
         try:
-            create_bom_creator_document(bom_structure)
+            create_batch_fgs(batch, history, lock_errors)
+        except TRANSACTION_ERRORS as e:
+            # the savepoints went with the transaction, nothing of the batch is left
+            frappe.db.rollback()
+            fail_batch(batch, history, e)
+
+        # commits the batch
+        set_progress(batch[-1].get("current_index") + 1, total_length, "Import BOM Creator", history)
+
+    # jobs may finish out of order, so the run is complete once no FG is left pending
+    if not has_pending_fgs(history):
+        update_bom_creation_tool_history(history)
+
+
+def create_batch_fgs(batch, history, lock_errors):
+    error_logs = []
+
+    for fg in batch:
+        bom_structure = fg.get("bom_structure")
+        item_code = bom_structure.get("item")
+        fg_status = "Failed"
+
+        if item_code in lock_errors:
+            error_logs.append(lock_errors[item_code])
+        elif fg.get("should_proceed"):
+            savepoint = f"bom_creator_fg_{fg.get('current_index')}"
+            frappe.db.savepoint(savepoint)
+            try:
+                fg_status = replace_bom_creator_document(bom_structure, fg.get("rows"))
+            except TRANSACTION_ERRORS:
+                raise
+            except Exception as e:
+                frappe.db.rollback(save_point=savepoint)
+                error_logs.append(get_running_error_log(bom_structure, e))
+
+        set_fg_checkpoint_status(fg.get("checkpoint"), fg_status)
+
+    if error_logs:
+        insert_error_logs(history, error_logs)
+
+
+def fail_batch(batch, history, error):
+    for fg in batch:
+        set_fg_checkpoint_status(fg.get("checkpoint"), "Failed")
+
+    # FGs which failed validation are logged already
+    error_logs = [
+        get_running_error_log(fg.get("bom_structure"), error)
+        for fg in batch
+        if fg.get("should_proceed")
+    ]
+    if error_logs:
+        insert_error_logs(history, error_logs)
+
+
+def acquire_fg_locks(fg_locks, batch, execution_mode="Fan Out"):
+    """Lock the FGs of the batch, as another import may be replacing them concurrently
+
+    Locks are taken in item code order, so two imports sharing FGs cannot deadlock.
+    Returns the error logs of the FGs that could not be locked.
+    """
+    bom_structures = {
+        fg.get("bom_structure").get("item"): fg.get("bom_structure")
+        for fg in batch
+        if fg.get("should_proceed")
+    }
+    timeout, blocking_timeout = get_fg_lock_timeouts(execution_mode)
+    # the wait is shared by the locks of the batch, so it does not grow with the batch
+    wait_until = time.monotonic() + blocking_timeout
+    lock_errors = {}
+
+    for item_code in sorted(bom_structures):
+        lock = get_fg_lock(item_code, timeout)
+        try:
+            acquired = lock.acquire(blocking_timeout=max(wait_until - time.monotonic(), 0))
         except Exception as e:
-            traceback = frappe.get_traceback()
-            histoy_doc = frappe.get_doc("BOM Creator Tool History", history)
-            histoy_doc.append(
-                "error_logs",
-                {
-                    "error": str(e),
-                    "final_product": item_code,
-                    "row_number": int(index),
-                    "failed_while": "Running",
-                    "full_traceback": traceback,
-                },
+            lock_errors[item_code] = get_running_error_log(bom_structures[item_code], e)
+            continue
+
+        if not acquired:
+            lock_errors[item_code] = get_running_error_log(
+                bom_structures[item_code],
+                f"Finished good {item_code} is being imported by another import. "
+                "Please resume this import once it has finished.",
             )
-            histoy_doc.save()
+            continue
 
-    set_progress(current_index + 1, total_length, "Import BOM Creator")
+        fg_locks.callback(release_fg_lock, lock)
 
-    if is_last_itr:
-        update_bom_creation_tool_history(history)
+    return lock_errors
+
+
+def get_fg_lock_timeouts(execution_mode):
+    """Return how long FG locks are held and waited for, in seconds
+
+    Locks expire with the job holding them. Inline imports run in a web request,
+    so they do not wait for FGs locked by other imports.
+    """
+    if execution_mode == "Inline":
+        return cint(frappe.conf.http_timeout) or 120, 0
+
+    timeout = get_queues_timeout()["short" if execution_mode == "Single Job" else "long"]
+    # leaves the job the time to create the FGs
+    return timeout, min(FG_LOCK_WAIT, timeout // 2)
+
+
+def release_fg_lock(lock):
+    try:
+        lock.release()
+    except LockError:
+        # expired before the batch committed, its FGs are saved regardless
+        frappe.logger("esoft_bom_importer").warning(f"FG lock {lock.name} expired before release")
+
+
+def get_running_error_log(bom_structure, error):
+    return {
+        "error": str(error),
+        "final_product": bom_structure.get("item"),
+        "row_number": int(bom_structure.get("index")),
+        "row_numbers": str(bom_structure.get("index")),
+        "occurrences": 1,
+        "sheet": bom_structure.get("sheet"),
+        "failed_while": "Running",
+        "full_traceback": frappe.get_traceback(),
+    }
+
+
+def replace_bom_creator_document(bom_structure, rows=None):
+    existing_name = frappe.db.exists("BOM Creator", {"item_code": bom_structure.get("item")})
+    if existing_name:
+        existing_doc = frappe.get_doc("BOM Creator", existing_name)
+        if existing_doc.docstatus == 0:
+            frappe.delete_doc("BOM Creator", existing_name)
+        else:
+            # Skip if already submitted
+            return "Skipped"
+
+    create_bom_creator_document(bom_structure, rows)
+    return "Success"
+
+
+def get_fg_lock(item_code, timeout):
+    cache = frappe.cache()
+    return cache.lock(cache.make_key(f"bom_creator_fg_lock::{item_code}"), timeout=timeout)
+
+
+def insert_error_logs(history, error_logs):
+    """Insert log rows directly, the History is never saved by the jobs
+
+    Saving it would write back its checkpoint and log rows as loaded by this job,
+    overwriting what the other jobs of the import have written since.
+    """
+    # locks the History until the batch is committed, so concurrent jobs get unique idx
+    frappe.db.get_value("BOM Creator Tool History", history, "name", for_update=True)
+    last_idx = frappe.db.sql(
+        """select ifnull(max(idx), 0) from `tabBOM Creator History Log`
+        where parent=%s and parenttype='BOM Creator Tool History'""",
+        history,
+    )[0][0]
+
+    for idx, error_log in enumerate(error_logs, start=cint(last_idx) + 1):
+        frappe.get_doc(
+            {
+                "doctype": "BOM Creator History Log",
+                "parent": history,
+                "parenttype": "BOM Creator Tool History",
+                "parentfield": "error_logs",
+                "idx": idx,
+                **error_log,
+            }
+        ).db_insert()
+
+
+def set_fg_checkpoint_status(checkpoint, status):
+    # by name, so only the row of the FG is locked until the batch commits
+    if checkpoint:
+        frappe.db.set_value(
+            "BOM Creator History FG",
+            checkpoint,
+            {"status": status, "processed_at": now()},
+            update_modified=False,
+        )
+
+
+def has_pending_fgs(history):
+    return bool(
+        frappe.db.exists("BOM Creator History FG", {"parent": history, "status": "Pending"})
+    )
+
+
+def set_fg_checkpoint(history_doc, checkpoints, bom_structure, status):
+    item_code = bom_structure.get("item")
+    row = checkpoints.get(item_code)
+
+    if not row:
+        row = history_doc.append(
+            "fg_checkpoints",
+            {
+                "final_product": item_code,
+                "row_number": int(bom_structure.get("index")),
+                "sheet": bom_structure.get("sheet"),
+            },
+        )
+        checkpoints[item_code] = row
+
+    row.status = status
+
+
+def get_resumable_bom_tree(history_doc, bom_tree):
+    """Return the FGs of the import which have not been created yet"""
+    if not history_doc.fg_checkpoints:
+        frappe.throw(
+            f"Import {history_doc.name} has no checkpoint to resume from. Please re-import the file."
+        )
+
+    completed = {
+        row.final_product
+        for row in history_doc.fg_checkpoints
+        if row.status in ("Success", "Skipped")
+    }
+
+    return [bom for bom in bom_tree if bom.get("item") not in completed]
 
 
 def update_bom_creation_tool_history(history):
@@ -56,307 +286,399 @@ def update_bom_creation_tool_history(history):
     if frappe.db.exists("BOM Creator History Log", {"parent": history}):
         status = "Failed"
 
-    update_bom_creator_tool_status(history, status)
+    frappe.db.set_value("BOM Creator Tool History", history, "job_status", status)
 
     completed_at = now()
     completed_at_parsed = datetime.strptime(completed_at, "%Y-%m-%d %H:%M:%S.%f")
     started_at = frappe.db.get_value("BOM Creator Tool History", history, "started_at")
-    diff = completed_at_parsed - started_at
-    diff = round(diff.total_seconds() / 60)
+    elapsed_seconds = (completed_at_parsed - started_at).total_seconds()
+    diff = round(elapsed_seconds / 60)
+
+    # finished goods created per minute, to compare runs with different batch sizes.
+    # started_at is reset on resume, so FGs created by earlier runs are not counted
+    created = frappe.db.count(
+        "BOM Creator History FG",
+        {"parent": history, "status": "Success", "processed_at": [">=", started_at]},
+    )
+    throughput = flt(created * 60 / elapsed_seconds, 2) if elapsed_seconds else 0
 
     frappe.db.set_value(
         "BOM Creator Tool History",
         history,
-        {"completed_at": now(), "time_taken": str(diff)},
+        {"completed_at": now(), "time_taken": str(diff), "throughput": throughput},
     )
 
 
-def update_bom_creator_tool_status(history, status):
-    frappe.db.set_single_value("BOM Creator Tool", "status", status)
-    frappe.db.set_value("BOM Creator Tool History", history, "job_status", status)
+def get_tree_size(bom_tree):
+    size = 0
+    stack = list(bom_tree)
+
+    while stack:
+        node = stack.pop()
+        size += 1
+        stack.extend(node.get("children", []))
+
+    return size
+
+
+def get_tool_settings(defaults):
+    """Return the given BOM Creator Tool settings, with `defaults` for the unsaved ones
 
+    Defaults of a Single are only written when it is saved, so settings added after
+    that, or never saved on a fresh install, read as unset. A saved 0 is kept.
+    """
+    values = frappe.db.get_value("BOM Creator Tool", None, list(defaults), as_dict=True) or {}
+
+    return frappe._dict(
+        {
+            field: default if values.get(field) in (None, "") else cint(values.get(field))
+            for field, default in defaults.items()
+        }
+    )
+
+
+def get_execution_mode(tree_size):
+    settings = get_tool_settings(EXECUTION_DEFAULTS)
+
+    if tree_size <= settings.inline_threshold:
+        return "Inline"
+
+    if tree_size <= settings.single_job_threshold:
+        return "Single Job"
+
+    return "Fan Out"
+
+
+def start_bom_import(bom_tree, history):
+    """Run the import in the execution mode suited to the size of the tree"""
+    tree_size = get_tree_size(bom_tree)
+    execution_mode = get_execution_mode(tree_size)
+    batch_size = max(get_tool_settings(EXECUTION_DEFAULTS).batch_size, 1)
+    frappe.db.set_value(
+        "BOM Creator Tool History",
+        history,
+        {"execution_mode": execution_mode, "tree_size": tree_size, "batch_size": batch_size},
+    )
+
+    if execution_mode == "Inline":
+        validate_and_enqueue_bom_creation(bom_tree, history, execution_mode, batch_size)
+    else:
+        frappe.enqueue(
+            method=validate_and_enqueue_bom_creation,
+            queue="short" if execution_mode == "Single Job" else "long",
+            job_name=get_job_name(history),
+            bom_tree=bom_tree,
+            history=history,
+            execution_mode=execution_mode,
+            batch_size=batch_size,
+        )
+
+    return execution_mode
+
+
+def validate_and_enqueue_bom_creation(bom_tree, history, execution_mode="Fan Out", batch_size=1):
+    from frappe.desk.treeview import get_all_nodes
 
-def validate_and_enqueue_bom_creation(bom_tree, history):
     total_length = len(bom_tree)
     history_doc = frappe.get_doc("BOM Creator Tool History", history)
     nodes = get_all_nodes("Item Group", "RM", "RM", "frappe.desk.treeview.get_children")
-    rm_groups =  clean_hierarchical_json(nodes, root="RM")
+    rm_groups =  set(clean_hierarchical_json(nodes, root="RM"))
+    masters = get_validation_masters(bom_tree)
+    checkpoints = {row.final_product: row for row in history_doc.fg_checkpoints}
+    validation_errors = {}
+    fgs = []
 
     for index, bom_structure in enumerate(bom_tree):
-        is_last_itr = index == (total_length - 1)
-        should_proceed = validate_bom_structure(bom_structure, history_doc, is_last_itr, rm_groups)
-        frappe.enqueue(
-            method=create_bom_from_hierarchy,
-            queue="long",
-            job_name="bom_creator_job",
-            bom_structure=bom_structure,
-            current_index=index,
-            total_length=total_length,
-            history=history,
-            should_proceed=should_proceed,
+        fg_errors, rows = walk_bom_structure(bom_structure, rm_groups, masters)
+        merge_validation_errors(validation_errors, fg_errors)
+        should_proceed = not fg_errors
+        set_fg_checkpoint(
+            history_doc, checkpoints, bom_structure, "Pending" if should_proceed else "Failed"
+        )
+        # jobs get the flattened rows, so the tree is not walked again
+        fgs.append(
+            {
+                "bom_structure": get_node_fields(bom_structure),
+                "rows": rows,
+                "current_index": index,
+                "should_proceed": should_proceed,
+            }
         )
 
-    history_doc.save()
+    append_validation_errors(history_doc, validation_errors)
 
+    # set once here, batch jobs writing the History would wait on each other's transactions
+    history_doc.job_status = "In Progress"
 
-def validate_bom_structure(
-    bom_structure,
-    history_doc,
-    is_last_itr,
-    rm_groups,
-    final_product=None,
-    should_proceed=True
-):
-    if not final_product:
-        final_product = bom_structure.get("item")
+    # checkpoint must be visible to the jobs before they start
+    history_doc.save()
+    frappe.db.commit()
 
-    item_group = bom_structure.get("item_group")
-    index = bom_structure.get("index")
-    operations = bom_structure.get("operation")
-    operations = operations.split("+")
-    hsn_code = bom_structure.get("hsn_code")
-    material = bom_structure.get("matl")
-    uom = bom_structure.get("uom")
+    for fg in fgs:
+        fg["checkpoint"] = checkpoints[fg["bom_structure"].get("item")].name
 
-    if material:
-        if not validate_material_group_in_rm_list(rm_groups, material):
-            err = (
-                f"Material: '{material}' is not under the allowed RM hierarchy. "
-                f"Please ensure it belongs to the RM or its sub-groups."
-            )
-            history_doc.append(
-                "error_logs",
-                {
-                    "error": err,
-                    "final_product": final_product,
-                    "row_number": int(index),
-                    "failed_while": "Validating",
-                },
-            )
-            should_proceed = False
+    for start in range(0, total_length, batch_size):
+        kwargs = {
+            "batch": fgs[start:start + batch_size],
+            "total_length": total_length,
+            "history": history,
+            "execution_mode": execution_mode,
+        }
 
-    if not frappe.db.exists("Item Group", item_group):
-        err = f"Item Group {item_group} does not exist in the system. Please create it before importing BOM."
-        history_doc.append(
-            "error_logs",
-            {
-                "error": err,
-                "final_product": final_product,
-                "row_number": int(index),
-                "failed_while": "Validating",
-            },
+        if execution_mode == "Fan Out":
+            frappe.enqueue(
+                method=create_bom_batch,
+                queue="long",
+                job_name=get_job_name(history),
+                **kwargs,
+            )
+        else:
+            create_bom_batch(**kwargs)
+
+
+VALIDATION_ERRORS = {
+    "Material": (
+        "Material: '{0}' is not under the allowed RM hierarchy. "
+        "Please ensure it belongs to the RM or its sub-groups."
+    ),
+    "Item Group": "Item Group {0} does not exist in the system. Please create it before importing BOM.",
+    "GST HSN Code": "GST HSN Code {0} does not exist in the system. Please create it before importing BOM.",
+    "UOM": "UOM '{0}' does not exist in the system. Please create it before importing BOM.",
+    "Operation": "Operation {0} does not exist in the system. Please create it before importing BOM.",
+}
+
+
+def get_validation_masters(bom_tree):
+    """Return the lower cased names of the masters referenced by the tree which exist"""
+    values = defaultdict(set)
+    stack = list(bom_tree)
+
+    while stack:
+        node = stack.pop()
+        values["Item Group"].add(node.get("item_group"))
+        values["GST HSN Code"].add(node.get("hsn_code"))
+        values["UOM"].add(node.get("uom"))
+        values["Operation"].update(
+            operation.strip() for operation in node.get("operation").split("+") if operation.strip()
         )
-        should_proceed = False
+        stack.extend(node.get("children", []))
 
-    if not frappe.db.exists("GST HSN Code", hsn_code):
-        err = f"GST HSN Code {hsn_code} does not exist in the system. Please create it before importing BOM."
-        history_doc.append(
-            "error_logs",
-            {
-                "error": err,
-                "final_product": final_product,
-                "row_number": int(index),
-                "failed_while": "Validating",
-            },
-        )
-        should_proceed = False
+    # names are matched case insensitively, like frappe.db.exists does
+    return {
+        doctype: {name.lower() for name in get_existing_names(doctype, "name", names)}
+        for doctype, names in values.items()
+    }
 
-    if not frappe.db.exists("UOM", uom):
-        err = f"UOM '{uom}' does not exist in the system. Please create it before importing BOM."
-        history_doc.append(
-            "error_logs",
-            {
-                "error": err,
-                "final_product": final_product,
-                "row_number": int(index),
-                "failed_while": "Validating",
-            },
-        )
-        should_proceed = False
 
-    for operation in operations:
-        operation = operation.strip()
+def walk_bom_structure(bom_structure, rm_groups=None, masters=None):
+    """Validate every node of an FG and flatten it into BOM Creator Item rows in one pass
 
-        if operation and not frappe.db.exists("Operation", operation):
-            err = f"Operation {operation} does not exist in the system. Please create it before importing BOM."
-            history_doc.append(
-                "error_logs",
+    The tree is walked with an explicit stack, so its depth is not limited by the
+    recursion limit. Validation is skipped if `masters` is not given.
+
+    Returns the validation errors of the FG, grouped like add_validation_error, and
+    the rows below the FG in depth first order with their parent_row_no and is_expandable.
+    """
+    final_product = bom_structure.get("item")
+    validation_errors = {}
+    rows = []
+    # (node, row number of its parent, whether it is a row of the BOM)
+    stack = [(bom_structure, None, False)]
+
+    while stack:
+        node, parent_row_no, is_row = stack.pop()
+
+        if masters is not None:
+            for check, value in get_failed_checks(node, rm_groups, masters):
+                add_validation_error(validation_errors, check, value, node, final_product)
+
+        row_no = None
+        if is_row:
+            rows.append(
                 {
-                    "error": err,
-                    "final_product": final_product,
-                    "row_number": int(index),
-                    "failed_while": "Validating",
-                },
+                    **get_node_fields(node),
+                    "parent_row_no": parent_row_no,
+                    "is_expandable": 1 if node.get("children") else 0,
+                }
             )
-            should_proceed = False
-
-    for child in bom_structure.get("children", []):
-        is_valid_child = validate_bom_structure(
-            bom_structure=child,
-            history_doc=history_doc,
-            is_last_itr=is_last_itr,
-            rm_groups=rm_groups,
-            should_proceed=should_proceed,
-            final_product=final_product,
-        )
+            row_no = len(rows)
 
-        # once its false, it will not be true again
-        should_proceed &= is_valid_child
+        # pushed in reverse, so children are visited in sheet order
+        stack.extend((child, row_no, True) for child in reversed(node.get("children", [])))
 
-    return should_proceed
+    return validation_errors, rows
 
 
-def get_file_full_path(file):
-    file_doc = frappe.get_doc("File", {"file_url": file})
-    return file_doc.get_full_path()
+def get_node_fields(node):
+    return {key: value for key, value in node.items() if key != "children"}
 
 
-def convert_spreadsheet_to_json(file: str) -> pd.DataFrame:
-    file_path = get_file_full_path(file)
-    ext = Path(file_path).suffix.lower()
-
-    if ext == ".xlsx":
-        df = pd.read_excel(file_path, engine="openpyxl", dtype=str)
-    elif ext == ".csv":
-        df = pd.read_csv(file_path, dtype=str)
-    else:
-        frappe.throw(f"Unsupported file format: {ext}")
+def get_failed_checks(node, rm_groups, masters):
+    operations = node.get("operation")
+    operations = operations.split("+")
+    material = node.get("matl")
+    failed_checks = []
 
-    df = clean_dataframe(df)
+    if material:
+        if not validate_material_group_in_rm_list(rm_groups, material):
+            failed_checks.append(("Material", material))
 
-    validate_mandatory_cols(df)
+    for doctype, value in (
+        ("Item Group", node.get("item_group")),
+        ("GST HSN Code", node.get("hsn_code")),
+        ("UOM", node.get("uom")),
+    ):
+        if (value or "").lower() not in masters[doctype]:
+            failed_checks.append((doctype, value))
 
-    return get_bom_tree_json(df)
+    for operation in operations:
+        operation = operation.strip()
 
+        if operation and operation.lower() not in masters["Operation"]:
+            failed_checks.append(("Operation", operation))
 
-def clean_dataframe(dataframe):
-    return dataframe.fillna("").map(lambda x: x.strip() if isinstance(x, str) else x)
+    return failed_checks
 
 
-def validate_mandatory_cols(df):
+def add_validation_error(validation_errors, check, value, bom_structure, final_product):
+    """Group the error with the other rows failing the same check for the same value"""
+    error = validation_errors.setdefault(
+        (check, value, bom_structure.get("sheet")), {"rows": [], "final_products": {}}
+    )
+    error["rows"].append(int(bom_structure.get("index")))
+    # dict keeps the FGs unique in the order they were found
+    error["final_products"][final_product] = None
 
-    blank_hsn_rows = get_hsn_blank_rows(df)
-    blank_item_group_rows = get_item_group_blank_rows(df)
-    uom_errors = get_invalid_uom_rows(df)
-    err = []
 
-    if uom_errors:
-        err.append(
-            "<b>UOM Validation Failed</b><br><br>"
-            "The following rows have invalid UOM usage:<br><ul>"
-            "<li><b>Powder Item Group</b> should use UOM = <code>KG</code>.</li>"
-            "<li>If UOM = <code>Nos</code>, then quantity must be a whole number (no decimals).</li>"
-            "</ul>"
-            f"<br>Affected Rows: {', '.join('Row ' + str(row) for row in uom_errors)}"
-        )
+def merge_validation_errors(validation_errors, fg_errors):
+    for key, fg_error in fg_errors.items():
+        error = validation_errors.setdefault(key, {"rows": [], "final_products": {}})
+        error["rows"].extend(fg_error["rows"])
+        error["final_products"].update(fg_error["final_products"])
 
-    if blank_hsn_rows:
-        err.append(
-            f"<li>The following rows are missing the <b>HSN/SAC</b> value in the attached BOM Creator file:</li>\n{', '.join('Row '+str(row) for row in blank_hsn_rows)}"
-        )
 
-    if blank_item_group_rows:
-        err.append(
-            f"<li>The following rows are missing the <b>ITEM GROUP</b> value in the attached BOM Creator file:</li>\n{', '.join('Row '+str(row) for row in blank_item_group_rows)}"
+def append_validation_errors(history_doc, validation_errors):
+    for (check, value, sheet), error in validation_errors.items():
+        final_products = list(error["final_products"])
+        history_doc.append(
+            "error_logs",
+            {
+                "error": VALIDATION_ERRORS[check].format(value),
+                "error_type": check,
+                "final_product": final_products[0],
+                "affected_products": ", ".join(final_products),
+                "row_number": min(error["rows"]),
+                "row_numbers": get_row_ranges(error["rows"]),
+                "occurrences": len(error["rows"]),
+                "sheet": sheet,
+                "failed_while": "Validating",
+            },
         )
-    if err:
-        frappe.throw("<br /><br />".join(err))
-
 
-def get_hsn_blank_rows(df):
-    matl = df["HSN/SAC"].isna() | (df["HSN/SAC"].astype(str).str.strip() == "")
-    blank_hsn_rows = (df[matl].index + 2).tolist()
 
-    return blank_hsn_rows
+def get_row_ranges(rows):
+    """Compress row numbers into ranges, e.g. [2, 3, 4, 7] -> '2-4, 7'"""
+    ranges = []
 
-def get_item_group_blank_rows(df):
-    item_group = df["ITEM GROUP"].isna() | (df["ITEM GROUP"].astype(str).str.strip() == "")
-    blank_item_group_rows = (df[item_group].index + 2).tolist()
+    for row in sorted(set(rows)):
+        if ranges and row == ranges[-1][1] + 1:
+            ranges[-1][1] = row
+        else:
+            ranges.append([row, row])
 
-    return blank_item_group_rows
+    return ", ".join(str(start) if start == end else f"{start}-{end}" for start, end in ranges)
 
-def get_invalid_uom_rows(df):
-    bad_rows = []
 
-    for idx, row in df.iterrows():
-        item_group = str(row.get("ITEM GROUP", "")).strip().lower()
-        uom = str(row.get("UOM", "")).strip().lower()
-        qty = row.get("QTY/ SET", 0)
+def get_fg_products(bom_tree):
+    fg_products = [bom.get("item") for bom in bom_tree if bom.get("item")]
+    if not fg_products:
+        frappe.throw("No valid BOM structures found in the file.")
 
-        if "powder" in item_group and uom != "kg":
-            bad_rows.append(idx + 2)
-            continue
+    return fg_products
 
-        try:
-            qty = float(qty)
-            if uom == "nos" and not qty.is_integer():
-                bad_rows.append(idx + 2)
-        except (ValueError, TypeError):
-            bad_rows.append(idx + 2)
 
-    return bad_rows
+def get_import_preview(bom_tree):
+    """Return summary statistics and per FG actions of an import, using bulk queries"""
+    get_fg_products(bom_tree)
 
+    fg_products = []
+    item_codes = set()
+    total_nodes = 0
+    max_depth = 0
 
-def get_bom_tree_json(df):
-    """Build a hierarchical BOM structure from a DataFrame."""
-    node_map = {}
-    root_nodes = []
+    for bom in bom_tree:
+        nodes = 0
+        stack = [(bom, 1)]
 
-    def clean(val):
-        return str(val).strip() if pd.notna(val) else ""
+        while stack:
+            node, depth = stack.pop()
+            nodes += 1
+            max_depth = max(max_depth, depth)
+            item_codes.add(node.get("item"))
+            stack.extend((child, depth + 1) for child in node.get("children", []))
 
-    for idx, row in df.iterrows():
-        item_id = clean(row.get("Sub-Assembly")) or clean(row.get("SR NO"))
-        if not item_id:
-            continue
+        total_nodes += nodes
+        fg_products.append(
+            {
+                "item": bom.get("item"),
+                "sheet": bom.get("sheet"),
+                "row_number": bom.get("index"),
+                "nodes": nodes,
+                "action": "Create",
+            }
+        )
 
-        node = {
-            "index": idx + 2,
-            "item": item_id,
-            "rev": clean(row.get("REV")),
-            "description": clean(row.get("PART DESCRIPTION")),
-            "parent_item": clean(row.get("Parent")),
-            "matl": clean(row.get("MATL")),
-            "item_group": clean(row.get("ITEM GROUP")),
-            "operation": clean(row.get("operation")),
-            "den": clean(row.get("Den")),
-            "qty_per_set": clean(row.get("QTY/ SET")) or "1",
-            "length": clean(row.get("L")) or 0,
-            "width": clean(row.get("W")) or 0,
-            "thickness": clean(row.get("T")) or 0,
-            "bl_weight": clean(row.get("BL.WT.")) or 0,
-            "area_sq_ft": clean(row.get("AREA SQ.FT.")) or 0,
-            "hsn_code": clean(row.get("HSN/SAC")),
-            "uom": clean(row.get("UOM")) or "Nos",
-            "children": [],
-        }
+    existing_items = {name.lower() for name in get_existing_names("Item", "name", item_codes)}
+    # names are matched case insensitively, like get_validation_masters does
+    item_codes = {item_code.lower() for item_code in item_codes}
+    bom_creators = get_bom_creator_docstatus([fg.get("item") for fg in fg_products])
+
+    for fg in fg_products:
+        docstatus = bom_creators.get(fg["item"])
+        if docstatus is not None:
+            # submitted and cancelled BOM Creators are skipped during import
+            fg["action"] = "Replace" if docstatus == 0 else "Skip"
+
+    return {
+        "fg_count": len(fg_products),
+        "total_nodes": total_nodes,
+        "max_depth": max_depth,
+        "new_items": len(item_codes - existing_items),
+        "existing_items": len(item_codes & existing_items),
+        "drafts_replaced": sum(1 for fg in fg_products if fg["action"] == "Replace"),
+        "submitted_skipped": sum(1 for fg in fg_products if fg["action"] == "Skip"),
+        "fg_products": fg_products,
+    }
 
-        node_map[item_id] = node
-        parent_id = node["parent_item"]
 
-        if parent_id and parent_id in node_map:
-            node_map[parent_id]["children"].append(node)
-        else:
-            root_nodes.append(node)
+def get_existing_names(doctype, fieldname, values, chunk_size=1000):
+    values = list(values)
+    existing = set()
 
-    return root_nodes
+    for start in range(0, len(values), chunk_size):
+        existing.update(
+            frappe.get_all(
+                doctype,
+                filters={fieldname: ["in", values[start:start + chunk_size]]},
+                pluck=fieldname,
+            )
+        )
 
+    return existing
 
-def add_node_to_parent(parent_item, node, node_map, root_nodes):
-    """Add node to its parent or root if parent not found"""
-    parent_node = node_map.get(parent_item)
-    if parent_node:
-        parent_node["children"].append(node)
-    else:
-        root_nodes.append(node)
 
+def get_bom_creator_docstatus(item_codes, chunk_size=1000):
+    docstatus = {}
 
-def get_fg_products(bom_tree):
-    fg_products = [bom.get("item") for bom in bom_tree if bom.get("item")]
-    if not fg_products:
-        frappe.throw("No valid BOM structures found in the file.")
+    for start in range(0, len(item_codes), chunk_size):
+        for row in frappe.get_all(
+            "BOM Creator",
+            filters={"item_code": ["in", item_codes[start:start + chunk_size]]},
+            fields=["item_code", "docstatus"],
+        ):
+            docstatus[row.item_code] = row.docstatus
 
-    return fg_products
+    return docstatus
 
 
 def get_or_create_item(bom_structure):
@@ -382,7 +704,12 @@ def get_or_create_item(bom_structure):
         "gst_hsn_code": get_gst_hsn_code(hsn_code),
     }
 
-    item = frappe.get_doc(item_data).insert(ignore_permissions=True)
+    try:
+        item = frappe.get_doc(item_data).insert(ignore_permissions=True)
+    except frappe.DuplicateEntryError:
+        # created by a concurrent import in the meantime
+        item = frappe.get_doc("Item", item_code)
+
     return item
 
 
@@ -420,13 +747,18 @@ def get_item_group(group_name):
     return item_group
 
 
-def create_bom_creator_document(bom_structure):
+def create_bom_creator_document(bom_structure, rows=None):
     """Create complete BOM Creator document with all required fields"""
+    from erpnext import get_default_company
+
     item = get_or_create_item(bom_structure)
     company = get_default_company()
 
     root_item_code = bom_structure.get("item")
 
+    if rows is None:
+        _, rows = walk_bom_structure(bom_structure)
+
     bom_data = {
         "doctype": "BOM Creator",
         "item_code": item.name,
@@ -435,30 +767,42 @@ def create_bom_creator_document(bom_structure):
         "uom": item.stock_uom,
         "company": company,
         "status": "Draft",
-        "items": get_sub_assembly(
-            bom_structure.get("children", []),
-            parent_index=None,
-            parent_item_code=root_item_code,
-            flat_list=None
-        ),
+        "items": get_sub_assembly(rows, root_item_code),
         "__newname": item.name,
     }
 
     bom_creator = frappe.get_doc(bom_data)
 
+    bulk_insert_threshold = get_tool_settings(EXECUTION_DEFAULTS).bulk_insert_threshold
+    if bulk_insert_threshold and len(bom_creator.items) >= bulk_insert_threshold:
+        insert_bom_creator_in_bulk(bom_creator)
+        return
+
     bom_creator.insert(ignore_permissions=True)
     bom_creator.set_reference_id()  # Mandatory for BOM Creator Items to set fg_reference_id
 
     bom_creator.set("__unsaved", 1)
     bom_creator.save(ignore_permissions=True)
 
-    frappe.db.commit()
 
-def get_sub_assembly(items, parent_index=None, parent_item_code=None, flat_list=None):
-    if flat_list is None:
-        flat_list = []
+def insert_bom_creator_in_bulk(bom_creator):
+    """Insert a BOM Creator in a single save, writing its items with multi-row INSERTs"""
+    # row names are needed before the insert to set fg_reference_id,
+    # which saves the second save of the regular path
+    for row in bom_creator.items:
+        row.name = frappe.generate_hash(length=10)
 
-    for child in items:
+    bom_creator.set_reference_id()
+    bom_creator.flags.bulk_insert_items = True
+    bom_creator.insert(ignore_permissions=True, set_child_names=False)
+    bom_creator.flags.items_inserted = False
+
+def get_sub_assembly(rows, root_item_code):
+    flat_list = []
+    # item names of the rows, to set fg_item of their children
+    item_names = []
+
+    for child in rows:
         it = get_or_create_item(child)
         operations = get_operations(child.get("operation"))
         operations = ", ".join(operations) if operations else ""
@@ -472,6 +816,7 @@ def get_sub_assembly(items, parent_index=None, parent_item_code=None, flat_list=
         length_range = "Above 3 Mtrs" if length > 3000 else "Till 3 Mtrs"
         thickness_range = "Above 3 MM" if thickness > 3 else "Till 3 MM"
         uom = it.stock_uom
+        parent_row_no = child.get("parent_row_no")
 
         item = {
             "doctype": "BOM Creator Item",
@@ -490,24 +835,14 @@ def get_sub_assembly(items, parent_index=None, parent_item_code=None, flat_list=
             "custom_area_sqft": area_sq_ft,
             "custom_range": length_range,
             "custom_rangethickness": thickness_range,
-            "is_expandable": 1 if child.get("children") else 0,
+            "is_expandable": child.get("is_expandable"),
             "uom": uom,
-            "fg_item": parent_item_code,  # Set parent item code directly
-            "parent_row_no": parent_index + 1 if parent_index is not None else None,  # Use parent index
+            "fg_item": item_names[parent_row_no - 1] if parent_row_no else root_item_code,
+            "parent_row_no": parent_row_no,
         }
 
-        # Append to flat list
         flat_list.append(item)
-        current_index = len(flat_list) - 1  # Current item's index in the list
-
-        # Recurse for children, passing current index and item code
-        if child.get("children"):
-            get_sub_assembly(
-                child["children"],
-                parent_index=current_index,
-                parent_item_code=it.name,
-                flat_list=flat_list,
-            )
+        item_names.append(it.name)
 
     return flat_list
 
@@ -517,15 +852,14 @@ def validate_material_group_in_rm_list(rm_group_list, material_group):
     return True
 
 def clean_hierarchical_json(data, root="RM"):
-    def collect_items(parent_key, data_map):
-        collected = []
-        children = data_map.get(parent_key, [])
-        for item in children:
-            collected.append(item["value"])
-            if item["expandable"]:
-                collected.extend(collect_items(item["value"], data_map))
-        return collected
-
     data_map = {entry["parent"]: entry["data"] for entry in data}
+    collected = []
+    stack = list(reversed(data_map.get(root, [])))
+
+    while stack:
+        item = stack.pop()
+        collected.append(item["value"])
+        if item["expandable"]:
+            stack.extend(reversed(data_map.get(item["value"], [])))
 
-    return collect_items(root, data_map)
+    return collected
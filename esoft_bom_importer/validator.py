@@ -2,12 +2,34 @@ import frappe
 from frappe import _
 from frappe.utils.background_jobs import get_jobs
 
-def validate_migration_jobs():
-    if is_migration_jobs_queued():
+JOB_NAME = "bom_creator_job"
+
+
+def get_job_name(history):
+    return f"{JOB_NAME}::{history}"
+
+
+def validate_migration_jobs(history=None):
+    if is_migration_jobs_queued(history):
         frappe.throw(_("There are unfinished jobs in the queue. Please try again later."))
 
 
-def is_migration_jobs_queued():
+def validate_file_not_in_import(file):
+    running = frappe.get_all(
+        "BOM Creator Tool History",
+        filters={"file": file, "job_status": ["in", ["Validating", "In Progress"]]},
+        pluck="name",
+    )
+
+    for history in running:
+        if is_migration_jobs_queued(history):
+            frappe.throw(_("This file is already being imported in {0}. Please try again later.").format(history))
+
+
+def is_migration_jobs_queued(history=None):
+    """Check for queued import jobs, of one import if `history` is given, else of any import"""
     jobs = get_jobs(site=frappe.local.site, key="job_name")[frappe.local.site]
-    return any("bom_creator_job" in job for job in jobs)  # noqa: 501
+    if history:
+        return get_job_name(history) in jobs
 
+    return any(JOB_NAME in job for job in jobs)  # noqa: 501